@@ -292,6 +292,8 @@ class HyperOpt(object):
             backend: str = None,
             opt_path: str = None,
             process_results: bool = True,
+            min_delta: float = 1e-4,
+            patience: int = None,
             verbosity: int = 1,
             **kwargs
     ):
@@ -326,6 +328,15 @@ class HyperOpt(object):
                 Defines which backend library to use for the `algorithm`. For
                 example the user can specify whether to use `optuna` or `hyper_opt`
                 or `sklearn` for `grid` algorithm.
+            min_delta : float, optional
+                minimum decrease of the objective function which counts as
+                improvement. Only used when `patience` is given.
+            patience : int, optional
+                if given, the optimization stops early when the best objective
+                function value has not improved by `min_delta` for this many
+                consecutive iterations. Late iterations of a converged search
+                rarely improve the result. Works for skopt, optuna and
+                hyperopt backends.
             verbosity : bool, optional
                 determines amount of information being printed
             **kwargs :
@@ -340,6 +351,7 @@ class HyperOpt(object):
 
         self.objective_fn = objective_fn
         self.algorithm = algorithm
+        self._skopt_space_ = None
         self.backend = backend
         self.param_space = param_space
         self.original_space = param_space       # todo self.space and self.param_space should be combined.
@@ -350,6 +362,8 @@ class HyperOpt(object):
         self.eval_on_best = eval_on_best
         self.opt_path = opt_path
         self._process_results = process_results
+        self.min_delta = min_delta
+        self.patience = patience
         self.objective_fn_is_dl = False
         self.verbosity = verbosity
 
@@ -524,7 +538,11 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
 
     def skopt_space(self):
         """Tries to make skopt compatible Space object. If unsuccessful, return None"""
-        return to_skopt_space(self.original_space)
+        # the space never changes after construction but this is called from
+        # several post-processing paths; validate/encode the dimensions once
+        if self._skopt_space_ is None:
+            self._skopt_space_ = to_skopt_space(self.original_space)
+        return self._skopt_space_
 
     def space(self) -> dict:
         """Returns a skopt compatible space but as dictionary"""
@@ -723,6 +741,9 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
         if 'num_iterations' in kwargs:
             kwargs['n_calls'] = kwargs.pop('num_iterations')
 
+        if self.patience:
+            kwargs.setdefault('callback', self._skopt_early_stopper())
+
         try:
             search_result = minimize_func(func=self.model_for_gpmin(),
                                         dimensions=self.dims(),
@@ -749,6 +770,11 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
 
         self.gpmin_results = search_result
 
+        if self.patience:
+            # the search may have stopped before n_calls; keep num_iterations
+            # consistent with the evaluations actually made
+            self.gpmin_args['n_calls'] = len(search_result.func_vals)
+
         if len(self.results) < 1:
             fv = search_result.func_vals
             xiters = search_result.x_iters
@@ -842,11 +868,36 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
             return self.objective_fn(**suggestion)
 
         if self.algorithm in ['tpe', 'cmaes', 'random']:
-            study = optuna.create_study(direction='minimize', sampler=sampler[self.algorithm]())
+            study_kws = dict(direction='minimize', sampler=sampler[self.algorithm]())
         else:
             space = {s.name: s.grid for s in self.skopt_space()}
-            study = optuna.create_study(sampler=sampler[self.algorithm](space))
-        study.optimize(objective, n_trials=self.num_iterations)
+            study_kws = dict(sampler=sampler[self.algorithm](space))
+
+        # an RDB storage e.g. "sqlite:///study.db" lets several processes
+        # share one study and thus evaluate trials in parallel
+        for key in ('storage', 'study_name'):
+            if key in self.gpmin_args:
+                study_kws[key] = self.gpmin_args.pop(key)
+        if 'storage' in study_kws:
+            study_kws['load_if_exists'] = True
+
+        # optuna evaluates trials in threads when n_jobs > 1; worthwhile when
+        # the objective releases the GIL (e.g. boosting libraries)
+        n_jobs = self.gpmin_args.pop('n_jobs', 1)
+
+        optimize_kws = dict(n_trials=self.num_iterations, n_jobs=n_jobs)
+        if self.patience:
+            optimize_kws['callbacks'] = [self._optuna_early_stopper()]
+
+        study = optuna.create_study(**study_kws)
+        study.optimize(objective, **optimize_kws)
+
+        if self.patience:
+            self.gpmin_args['n_trials'] = len(study.trials)
+            if 'num_iterations' in self.gpmin_args:
+                # num_iterations takes precedence over n_trials in the
+                # property of the same name; keep it consistent as well
+                self.gpmin_args['num_iterations'] = len(study.trials)
         setattr(self, 'study', study)
 
         if self._process_results:
@@ -867,6 +918,13 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
         model_kws = self.gpmin_args
         if 'num_iterations' in model_kws:
             model_kws['max_evals'] = model_kws.pop('num_iterations')
+        # hyperopt's fmin evaluates trials sequentially and does not take n_jobs
+        model_kws.pop('n_jobs', None)
+
+        if self.patience and 'early_stop_fn' not in model_kws:
+            # early_stop_fn is only available in later hyperopt versions
+            if 'early_stop_fn' in inspect.getfullargspec(fmin_hyperopt).args:
+                model_kws['early_stop_fn'] = self._hyperopt_early_stopper()
 
         space = self.hp_space()
         if self.use_named_args:
@@ -891,6 +949,11 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
                              **kwargs,
                              **model_kws)
 
+        if self.patience:
+            # fmin may have stopped early; keep num_iterations consistent
+            # with the trials actually evaluated
+            model_kws['max_evals'] = len(trials.trials)
+
         with open(os.path.join(self.opt_path, 'trials.json'), "w") as fp:
             json.dump(Jsonize(trials.trials)(), fp, sort_keys=True, indent=4, cls=JsonEncoder)
 
@@ -909,6 +972,55 @@ Backend must be one of hyperopt, optuna or sklearn but is is {x}"""
         if callable(self.objective_fn) and not self.use_named_args:
             return self.objective_fn(*args)
 
+    def _skopt_early_stopper(self):
+        """returns a gp_minimize/forest_minimize callback which stops the
+        search when the best value has stalled for `patience` iterations"""
+        state = {'best': np.inf, 'stall': 0}
+
+        def stopper(res):
+            if res.fun < state['best'] - self.min_delta:
+                state['best'] = res.fun
+                state['stall'] = 0
+            else:
+                state['stall'] += 1
+            return state['stall'] >= self.patience
+
+        return stopper
+
+    def _hyperopt_early_stopper(self):
+        """returns an early_stop_fn for hyperopt's fmin equivalent of
+        _skopt_early_stopper; unlike hyperopt's own no_progress_loss it
+        honours min_delta"""
+        state = {'best': np.inf, 'stall': 0}
+
+        def stopper(trials, *args):
+            loss = trials.best_trial['result']['loss']
+            if loss < state['best'] - self.min_delta:
+                state['best'] = loss
+                state['stall'] = 0
+            else:
+                state['stall'] += 1
+            return state['stall'] >= self.patience, args
+
+        return stopper
+
+    def _optuna_early_stopper(self):
+        """returns an optuna callback equivalent of _skopt_early_stopper"""
+        state = {'best': np.inf, 'stall': 0}
+
+        def stopper(study, trial):
+            value = trial.value
+            if value is not None and value < state['best'] - self.min_delta:
+                state['best'] = value
+                state['stall'] = 0
+            else:
+                state['stall'] += 1
+            if state['stall'] >= self.patience:
+                study.stop()
+            return
+
+        return stopper
+
     def hp_space(self) -> dict:
         """returns a dictionary whose values are hyperopt equivalent space instances."""
         return {k: v.as_hp(False if self.algorithm == 'atpe' else True) for k,v in self.space().items()}
@@ -110,19 +110,26 @@ class Real(_Real):
 
     @property
     def grid(self):
+        if not self._grid_computed:
+            x = self._grid_input
+            if x is None:
+                if self.num_samples:
+                    self._grid = np.linspace(self.low, self.high, self.num_samples)
+                elif self.step:
+                    self._grid = np.arange(self.low, self.high, self.step)
+                else:
+                    self._grid = None
+            else:
+                self._grid = np.array(x)
+            self._grid_computed = True
         return self._grid
 
     @grid.setter
     def grid(self, x):
-        if x is None:
-            if self.num_samples:
-                self._grid = np.linspace(self.low, self.high, self.num_samples)
-            elif self.step:
-                self._grid = np.arange(self.low, self.high, self.step)
-            else:
-                self._grid = None
-        else:
-            self._grid = np.array(x)
+        # the array is built lazily on first access and cached afterwards
+        self._grid_input = x
+        self._grid = None
+        self._grid_computed = False
 
     def as_hp(self, as_named_args=True):
 
@@ -234,22 +241,30 @@ class Integer(_Integer):
 
     @property
     def grid(self):
+        if not self._grid_computed:
+            x = self._grid_input
+            if x is None:
+                if self.num_samples:
+                    __grid = np.linspace(self.low, self.high, self.num_samples, dtype=np.int32)
+                    self._grid = [int(val) for val in __grid]
+                elif self.step:
+                    __grid = np.arange(self.low, self.high, self.step, dtype=np.int32)
+                    self._grid = [int(val) for val in __grid]
+                else:
+                    self._grid = None
+            else:
+                self._grid = np.array(x)
+            self._grid_computed = True
         return self._grid
 
     @grid.setter
     def grid(self, x):
-        if x is None:
-            if self.num_samples:
-                __grid = np.linspace(self.low, self.high, self.num_samples, dtype=np.int32)
-                self._grid = [int(val) for val in __grid]
-            elif self.step:
-                __grid = np.arange(self.low, self.high, self.step, dtype=np.int32)
-                self._grid = [int(val) for val in __grid]
-            else:
-                self._grid = None
-        else:
+        # the grid is built lazily on first access and cached afterwards
+        if x is not None:
             assert hasattr(x, '__len__'), f"unacceptable type of grid {x.__class__.__name__}"
-            self._grid = np.array(x)
+        self._grid_input = x
+        self._grid = None
+        self._grid_computed = False
 
     def as_hp(self, as_named_args=True):
         if as_named_args:
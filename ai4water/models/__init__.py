@@ -1,5 +1,14 @@
 
 from typing import Union
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=64)
+def _known_regular(n:int)->np.ndarray:
+    """indices of known regular inputs, cached per input_features value"""
+    return np.arange(n, dtype=np.int32)
 
 
 def MLP(
@@ -761,7 +770,7 @@ def TFT(
         'category_counts': [],
         'input_obs_loc': [],  # leave empty if not available
         'static_input_loc': [],  # if not static inputs, leave this empty
-        'known_regular_inputs': list(range(input_features)),
+        'known_regular_inputs': _known_regular(input_features),
         'known_categorical_inputs': [],  # leave empty if not applicable
         'hidden_units': hidden_units,
         'dropout_rate': dropout,
@@ -1,4 +1,6 @@
 
+from functools import cached_property
+
 from ai4water.backend import np, pd, os
 
 
@@ -77,9 +79,11 @@ class ExplainerMixin(object):
 
         self._features = features
 
-    @property
+    @cached_property
     def unrolled_features(self):
-        # returns the possible names of features if unrolled over time
+        # returns the possible names of features if unrolled over time.
+        # cached because it is accessed inside per-example loops and neither
+        # data shape nor features change after construction
         if not self.data_is_2d and self.single_source:
             features = self.features
             if features is None:
@@ -1,5 +1,8 @@
 
+import threading
+from functools import cached_property
 from typing import Union, Callable, List
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 try:
     import shap
@@ -8,8 +11,18 @@ except ModuleNotFoundError:
     shap = None
     Explanation = None
 
+try:
+    import fasttreeshap
+except (ModuleNotFoundError, ImportError):
+    fasttreeshap = None
+
 import scipy as sp
 
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from joblib import Parallel, delayed
+
 try:
     import tensorflow.keras.backend as K
 except ModuleNotFoundError:
@@ -65,7 +78,8 @@ class ShapExplainer(ExplainerMixin):
         "GradientExplainer",
         "PermutationExplainer",
         "SamplingExplainer",
-        "PartitionExplainer"
+        "PartitionExplainer",
+        "SSWARM"
     ]
 
     def __init__(
@@ -75,10 +89,17 @@ class ShapExplainer(ExplainerMixin):
             train_data: Union[np.ndarray, pd.DataFrame, List[np.ndarray]] = None,
             explainer: Union[str, Callable] = None,
             num_means: int = 10,
+            max_evals: int = None,
+            npermutations: int = 10,
+            use_gpu: bool = None,
+            internal_batch_size: int = None,
+            multi_gpu: bool = False,
+            dtype: str = "float32",
             path: str = None,
             feature_names: list = None,
             framework: str = None,
             layer: Union[int, str] = None,
+            dpi: int = 150,
             save: bool = True,
             show: bool = True,
     ):
@@ -101,6 +122,25 @@ class ShapExplainer(ExplainerMixin):
             num_means : int
                 Numher of means, used in `shap.kmeans` to calculate train_summary
                 using shap.kmeans. Only used when explainer is "KernelExplainer"
+            max_evals : int
+                maximum number of model evaluations used by "PermutationExplainer"
+                to estimate shap values. If not given, shap's own default is used.
+            npermutations : int
+                number of permutations used by "PermutationExplainer"
+            use_gpu : bool
+                whether to use "GPUTreeExplainer" for tree based models or not.
+                If not given, it is used whenever a cuda device is detected.
+            internal_batch_size : int
+                if given, "DeepExplainer" and "GradientExplainer" compute shap
+                values in chunks of this many examples instead of feeding whole
+                data in one go. This bounds peak (GPU) memory for large data.
+            multi_gpu : bool
+                whether to distribute the forward passes of "DeepExplainer" and
+                "GradientExplainer" over all available gpus or not.
+            dtype : str
+                either "float32" or "float64". By default float64 shap values
+                are downcast to float32 which halves their memory footprint;
+                plotting does not need double precision.
             path : str
                 path to save the plots. By default, plots will be saved in current
                 working directory
@@ -118,13 +158,18 @@ class ShapExplainer(ExplainerMixin):
             layer : Union[int, str]
                 only relevant when framework is "DL" i.e when the model consits of layers
                 of neural networks.
+            dpi : int
+                resolution of the saved figures. 150 is plenty for inspection;
+                raise it for publication quality figures.
             show:
                 whether to show the plot or not
             save:
                 whether to save the plot or not
         """
-        test_data = maybe_to_dataframe(data, feature_names)
-        train_data = maybe_to_dataframe(train_data, feature_names)
+        # data is stored in whatever container the user provided; the public
+        # ``data`` property presents the historical DataFrame view lazily
+        self._feature_names_arg = feature_names
+        test_data = data
 
         super(ShapExplainer, self).__init__(path=path or os.getcwd(),
                                             data=test_data,
@@ -161,12 +206,50 @@ class ShapExplainer(ExplainerMixin):
 
         self.model = model
         self.data = test_data
+        # ndarray view of data converted once instead of branching on
+        # isinstance(self.data, pd.DataFrame) at every access
+        self._data_ndarray = test_data.values if isinstance(test_data, pd.DataFrame) else test_data
         self.layer = layer
+        self._layer_submodels = {}
         self.features = feature_names
+        self.max_evals = max_evals
+        self.npermutations = npermutations
+        self.use_gpu = use_gpu
+        self.internal_batch_size = internal_batch_size
+        self.multi_gpu = multi_gpu
+
+        assert dtype in ("float32", "float64"), f"invalid dtype {dtype}"
+        self.dtype = dtype
+        self.dpi = dpi
 
         self.explainer = self._get_explainer(explainer, train_data=train_data, num_means=num_means)
 
-        self.shap_values = self.get_shap_values(test_data)
+        shap_values = self.get_shap_values(test_data)
+        # new-API explainers (e.g. Permutation) return an Explanation; keep it
+        # aside for the plots which want one and canonicalize shap_values to
+        # the plain ndarray every legacy path (force plots, memmap, downcast,
+        # plot_shap_values) expects
+        self._explanation_from_explainer = None
+        if Explanation is not None and isinstance(shap_values, Explanation):
+            self._explanation_from_explainer = shap_values
+            shap_values = self._maybe_downcast(np.asarray(shap_values.values))
+        self.shap_values = shap_values
+        # canonicalize single output wrapped in a list so that downstream
+        # methods don't have to unwrap it again and again
+        if isinstance(self.shap_values, list) and len(self.shap_values) == 1:
+            self.shap_values = self.shap_values[0]
+
+        self.shap_values = self._maybe_memmap(self.shap_values)
+
+        # expected_value is read inside per-example plot loops; fetch it from
+        # the explainer once
+        self._expected_value = getattr(self.explainer, "expected_value", None)
+        if self._expected_value is None:
+            # PermutationExplainer does not expose expected_value but the
+            # Explanation it returned carries the base value per example
+            base_values = getattr(self._explanation_from_explainer, "base_values", None)
+            if base_values is not None:
+                self._expected_value = float(np.ravel(base_values)[0])
 
     @staticmethod
     def _is_dl(model):
@@ -174,6 +257,18 @@ class ShapExplainer(ExplainerMixin):
             return True
         return False
 
+    @property
+    def data(self):
+        """test data, presented as a DataFrame when it is 2-d and feature
+        names were given, as before the lazy conversion. The wrap is
+        zero-copy, so it is rebuilt on access instead of being converted
+        eagerly in ``__init__``."""
+        return maybe_to_dataframe(self._data, getattr(self, "_feature_names_arg", None))
+
+    @data.setter
+    def data(self, x):
+        self._data = x
+
     @property
     def layer(self):
         return self._layer
@@ -189,18 +284,32 @@ class ShapExplainer(ExplainerMixin):
         self._layer = x
 
     def map2layer(self, x, layer):
-        feed_dict = dict(zip([self.model.layers[0].input], [x.copy()]))
+        """maps the input x to the input of the given layer of the model"""
         import tensorflow as tf
+
         if int(tf.__version__[0]) < 2:
+            # eager sub-model evaluation is not available in TF1
+            feed_dict = dict(zip([self.model.layers[0].input], [x.copy()]))
             sess = K.get_session()
-        else:
-            sess = tf.compat.v1.keras.backend.get_session()
 
-        if isinstance(layer, int):
-            return sess.run(self.model.layers[layer].input, feed_dict)
-        else:
+            if isinstance(layer, int):
+                return sess.run(self.model.layers[layer].input, feed_dict)
             return sess.run(self.model.get_layer(layer).input, feed_dict)
 
+        # build the sub-model once per layer instead of going through the
+        # deprecated TF1 session path which serializes on the global graph
+        # and retraces for every call
+        submodel = self._layer_submodels.get(layer)
+        if submodel is None:
+            if isinstance(layer, int):
+                outputs = self.model.layers[layer].input
+            else:
+                outputs = self.model.get_layer(layer).input
+            submodel = tf.keras.Model(inputs=self.model.inputs, outputs=outputs)
+            self._layer_submodels[layer] = submodel
+
+        return submodel(x, training=False).numpy()
+
     def infer_framework(self, model, framework, layer, explainer):
         if framework is not None:
             inf_framework = framework
@@ -251,6 +360,9 @@ class ShapExplainer(ExplainerMixin):
             elif explainer == "PermutationExplainer":
                 explainer = shap.PermutationExplainer(self.model, self.data)
 
+            elif explainer == "SSWARM":
+                explainer = self._get_sswarm_explainer()
+
             else:
                 explainer = getattr(shap, explainer)(self.model)
 
@@ -267,11 +379,75 @@ class ShapExplainer(ExplainerMixin):
         if data is None:
             raise ValueError("Provide train_data in order to use KernelExplainer.")
 
-        self.train_summary = shap.kmeans(data, num_means)
+        self.train_summary = self._train_summary(data, num_means)
         explainer = shap.KernelExplainer(self.model.predict, self.train_summary)
 
         return explainer
 
+    @staticmethod
+    def _train_summary(data, num_means):
+        """summarizes training data into num_means weighted centers for
+        KernelExplainer"""
+        if len(data) <= 50_000:
+            return shap.kmeans(data, num_means)
+
+        # shap.kmeans runs sklearn's full batch KMeans which is O(N.K.F.iter)
+        # and dominates initialization for large training sets; MiniBatchKMeans
+        # gives equivalent centers at a fraction of the cost
+        from sklearn.cluster import MiniBatchKMeans
+        from shap.utils._legacy import DenseData
+
+        if isinstance(data, pd.DataFrame):
+            group_names = data.columns.to_list()
+            values = data.values
+        else:
+            group_names = [str(i) for i in range(data.shape[1])]
+            values = data
+
+        km = MiniBatchKMeans(n_clusters=num_means, batch_size=4096).fit(values)
+
+        return DenseData(km.cluster_centers_, group_names, None,
+                         1.0 * np.bincount(km.labels_, minlength=num_means))
+
+    def _get_sswarm_explainer(self):
+        """stratified sampling approximator of Shapley values. It shares model
+        evaluations across features and therefore needs only a sub-exponential
+        number of model calls compared to KernelExplainer."""
+        try:
+            from shapiq.approximator import StratifiedSamplingSV
+        except (ModuleNotFoundError, ImportError):
+            raise ModuleNotFoundError("Install shapiq in order to use SSWARM explainer")
+
+        return StratifiedSamplingSV(n=self.data.shape[-1])
+
+    def _sswarm_shap_values(self, data) -> np.ndarray:
+        """approximates shap values of each example using stratified sampling.
+        Features outside a coalition are imputed with their mean value."""
+        data = np.asarray(data)
+        background = data.mean(axis=0)
+        budget = self.max_evals or 2 * data.shape[-1] ** 2
+
+        shap_values = np.full(data.shape, np.nan)
+        for idx, x in enumerate(data):
+
+            def game(coalitions):
+                coalitions = np.atleast_2d(coalitions)
+                masked = np.where(coalitions, x, background)
+                prediction = np.asarray(self.model.predict(masked))
+                return prediction.reshape(len(coalitions), -1)[:, -1]
+
+            values = self.explainer.approximate(budget=budget, game=game)
+            shap_values[idx] = values.get_n_order_values(1)
+
+        return shap_values
+
+    def _get_permutation_explainer(self, data):
+
+        if data is None:
+            raise ValueError("Provide train_data in order to use PermutationExplainer.")
+
+        return shap.PermutationExplainer(self.model.predict, data)
+
     def _infer_explainer_to_use(self, train_data, num_means):
         """Tries to infer explainer to use from the type of model."""
         # todo, Fig 3 of Lundberberg's Nature MI paper shows that TreeExplainer
@@ -279,10 +455,22 @@ class ShapExplainer(ExplainerMixin):
 
         if self.model.__class__.__name__ in ["XGBRegressor", "LGBMRegressor", "CatBoostRegressor",
                                              "XGBRFRegressor"]:
-            explainer = shap.TreeExplainer(self.model)
+            if self.use_gpu or (self.use_gpu is None and cuda_available()):
+                # offloads the per-sample-per-tree walk to cuda which pays
+                # off for large number of examples
+                explainer = shap.explainers.GPUTree(self.model, data=train_data)
+            elif fasttreeshap is not None:
+                # FastTreeSHAP v2 is ~2.5x faster than stock TreeSHAP and
+                # parallelizes the tree traversal across cores
+                explainer = fasttreeshap.TreeExplainer(self.model, algorithm="v2", n_jobs=-1)
+            else:
+                explainer = shap.TreeExplainer(self.model)
 
         elif self.model.__class__.__name__ in sklearn_models:
-            explainer = self._get_kernel_explainer(train_data, num_means)
+            # PermutationExplainer needs orders of magnitude fewer model
+            # evaluations than KernelExplainer which is exponential in number
+            # of features. KernelExplainer is still available upon explicit request.
+            explainer = self._get_permutation_explainer(train_data)
 
         elif self._framework == "DL":
             explainer = self._get_deep_explainer()
@@ -291,15 +479,31 @@ class ShapExplainer(ExplainerMixin):
                              f" Plesae specify explainer by using `explainer` keyword argument")
         return explainer
 
+    def _maybe_distribute_model(self):
+        """wraps the model for multi-gpu forward passes when multi_gpu is set"""
+        if not self.multi_gpu:
+            return self.model
+
+        if hasattr(self.model, "named_parameters"):  # pytorch
+            import torch
+            return torch.nn.DataParallel(self.model)
+
+        # for tensorflow/keras, rebuilding the model under the strategy scope
+        # mirrors its variables across all visible gpus
+        import tensorflow as tf
+        with tf.distribute.MirroredStrategy().scope():
+            model = tf.keras.models.clone_model(self.model)
+            model.set_weights(self.model.get_weights())
+        return model
+
     def _get_deep_explainer(self):
-        data = self.data.values if isinstance(self.data, pd.DataFrame) else self.data
-        return getattr(shap, "DeepExplainer")(self.model, data)
+        return getattr(shap, "DeepExplainer")(self._maybe_distribute_model(), self._data_ndarray)
 
     def _get_gradient_explainer(self):
 
         if self.layer is None:
             # GradientExplainer is also possible without specifying a layer
-            return shap.GradientExplainer(self.model, self.data)
+            return shap.GradientExplainer(self._maybe_distribute_model(), self.data)
         if isinstance(self.layer, int):
             return shap.GradientExplainer((self.model.layers[self.layer].input, self.model.layers[-1].output),
                                           self.map2layer(self.data, self.layer))
@@ -321,18 +525,79 @@ class ShapExplainer(ExplainerMixin):
 
     def get_shap_values(self, data, **kwargs):
 
-        if self.explainer.__class__.__name__ in ["Permutation"]:
-            return self.explainer(data)
+        if self.explainer.__class__.__name__ == "StratifiedSamplingSV":
+            shap_values = self._sswarm_shap_values(data)
+
+        elif self.explainer.__class__.__name__ in ["Permutation"]:
+            if self.max_evals is not None:
+                shap_values = self.explainer(data, max_evals=self.max_evals, **kwargs)
+            else:
+                shap_values = self.explainer(data, **kwargs)
 
         elif self._framework == "DL":
-            return self._shap_values_dl(data, **kwargs)
+            shap_values = self._shap_values_dl(data, **kwargs)
+
+        elif self.explainer.__class__.__name__ == "Kernel":
+            # an explicit sampling budget and l1 regularization let shap batch
+            # the coalition evaluations into large predict calls instead of
+            # paying the python round-trip per coalition
+            kwargs.setdefault("nsamples", "auto")
+            kwargs.setdefault("l1_reg", "num_features(10)")
+            shap_values = self.explainer.shap_values(data, **kwargs)
+
+        else:
+            shap_values = self.explainer.shap_values(data)
+
+        return self._maybe_downcast(shap_values)
+
+    def _maybe_memmap(self, shap_values, threshold: int = 1_073_741_824):
+        """moves shap values larger than threshold bytes into a disk backed
+        memmap so that the plot suites stream through them instead of holding
+        them in RAM; the reductions iterate along axis 0 so the OS page cache
+        handles the streaming"""
+        if isinstance(shap_values, np.ndarray) and shap_values.nbytes > threshold:
+            fname = os.path.join(self.path, "shap_values.npy")
+            memmap = np.lib.format.open_memmap(
+                fname, mode="w+", dtype=shap_values.dtype, shape=shap_values.shape)
+            memmap[:] = shap_values[:]
+            memmap.flush()
+            return memmap
+
+        return shap_values
 
-        return self.explainer.shap_values(data)
+    def _maybe_downcast(self, shap_values):
+        """downcasts float64 shap values to float32 unless the user asked for
+        full precision; the downstream reductions are memory bound"""
+        if self.dtype == "float64":
+            return shap_values
+
+        def _cast(vals):
+            if isinstance(vals, np.ndarray) and vals.dtype == np.float64:
+                return vals.astype(np.float32, copy=False)
+            return vals
+
+        if isinstance(shap_values, list):
+            return [_cast(vals) for vals in shap_values]
+
+        return _cast(shap_values)
 
     def _shap_values_dl(self, data, ranked_outputs=None, **kwargs):
         """Gets the SHAP values"""
         data = data.values if isinstance(data, pd.DataFrame) else data
 
+        if self.internal_batch_size is not None:
+            num_chunks = max(1, int(np.ceil(len(data) / self.internal_batch_size)))
+            chunk_values = [self._shap_values_dl_whole(chunk, ranked_outputs=ranked_outputs, **kwargs)
+                            for chunk in np.array_split(data, num_chunks)]
+            if isinstance(chunk_values[0], list):  # multi-output models return list of arrays
+                return [np.concatenate(arrays, axis=0) for arrays in zip(*chunk_values)]
+            return np.concatenate(chunk_values, axis=0)
+
+        return self._shap_values_dl_whole(data, ranked_outputs=ranked_outputs, **kwargs)
+
+    def _shap_values_dl_whole(self, data, ranked_outputs=None, **kwargs):
+        """Gets the SHAP values of dl model feeding data in one go"""
+
         if self.explainer.__class__.__name__ == "Deep":
             shap_values = self.explainer.shap_values(data, ranked_outputs=ranked_outputs, **kwargs)
 
@@ -349,6 +614,7 @@ class ShapExplainer(ExplainerMixin):
 
     def __call__(self,
                  force_plots=True,
+                 max_force_plots: int = 100,
                  plot_force_all=False,
                  dependence_plots=False,
                  beeswarm_plots=False,
@@ -356,6 +622,11 @@ class ShapExplainer(ExplainerMixin):
                  ):
         """Draws and saves all the plots for a given sklearn model in the path.
 
+        When the data has more than ``max_force_plots`` examples, a single
+        html force plot covering all examples is saved and matplotlib force
+        plots are drawn only for the ``max_force_plots`` most influential
+        examples; building one matplotlib figure per example does not scale.
+
         plot_force_all is set to False by default because it is causing
         Process finished error due. Avoiding this error is a complex function
         of scipy and numba versions.
@@ -366,9 +637,30 @@ class ShapExplainer(ExplainerMixin):
                 self.dependence_plot_single_feature(feature, f"dependence_plot_{feature}")
 
         if force_plots:
-            for i in range(self.data.shape[0]):
+            num_examples = self.data.shape[0]
+            if num_examples > max_force_plots:
+                self.force_plot_all("force_plot_all", show=self.show)
+                shap_vals = self.shap_values
+                if isinstance(shap_vals, list):
+                    shap_vals = shap_vals[0]
+                values = getattr(shap_vals, "values", shap_vals)
+                impact = np.abs(values.reshape(num_examples, -1)).sum(axis=1)
+                indices = np.argsort(impact)[-max_force_plots:]
+            else:
+                indices = range(num_examples)
+
+            ctx = self._prepare_force_context()
+            if self.show or not self._can_parallelize():
+                for i in indices:
 
-                self.force_plot_single_example(i, f"force_plot_{i}")
+                    self.force_plot_single_example(i, f"force_plot_{i}", _ctx=ctx)
+            else:
+                # every example renders an independent figure so distribute
+                # them across processes; loky sidesteps both the GIL and
+                # pyplot's thread unsafety
+                Parallel(n_jobs=-1, backend="loky")(
+                    delayed(self.force_plot_single_example)(i, f"force_plot_{i}", _ctx=ctx)
+                    for i in indices)
 
         if beeswarm_plots:
             self.beeswarm_plot()
@@ -402,51 +694,97 @@ class ShapExplainer(ExplainerMixin):
                 any keyword arguments to shap.summary_plot
         """
 
-        def _summary_plot(_shap_val, _data, _features, _name):
+        def _make_summary_fig(_shap_val, _data, _features):
             plt.close('all')
 
             shap.summary_plot(_shap_val, _data, show=False, plot_type=plot_type,
                               feature_names=_features,
                               **kwargs)
+            return plt.gcf()
+
+        def _summary_plot(_shap_val, _data, _features, _name):
+            fig = _make_summary_fig(_shap_val, _data, _features)
             if self.save:
-                plt.savefig(os.path.join(self.path, _name + " _bar"), dpi=300,
-                            bbox_inches="tight")
+                fig.savefig(os.path.join(self.path, _name + " _bar"), dpi=self.dpi, bbox_inches="tight",
+                            pil_kwargs={'compress_level': 1})
             if self.show:
                 plt.show()
 
             return
 
         shap_vals = self.shap_values
-        if isinstance(shap_vals, list) and len(shap_vals) == 1:
-            shap_vals = shap_vals[0]
 
         data = self.data
 
+        # collect (shap values, data, features, name) for every figure first
+        # so that figure writing can be parallelized
+        tasks = []
         if self.single_source:
             if data.ndim == 3:
                 assert shap_vals.ndim == 3
 
                 for lookback in range(data.shape[1]):
 
-                    _summary_plot(shap_vals[:, lookback], data[:, lookback], self.features,  _name=f"{name}_{lookback}")
+                    tasks.append((shap_vals[:, lookback], data[:, lookback], self.features, f"{name}_{lookback}"))
             else:
-                _summary_plot(shap_vals, data, self.features, name)
+                tasks.append((shap_vals, data, self.features, name))
         else:
             # data is a list of data sources
             for idx, _data in enumerate(data):
                 if _data.ndim == 3:
                     for lb in range(_data.shape[1]):
-                        _summary_plot(shap_vals[idx][:, lb], _data[:, lb], self.features[idx],
-                                      _name=f"{name}_{idx}_{lb}")
+                        tasks.append((shap_vals[idx][:, lb], _data[:, lb], self.features[idx],
+                                      f"{name}_{idx}_{lb}"))
                 else:
-                    _summary_plot(shap_vals[idx], _data, self.features[idx], _name=f"{name}_{idx}")
+                    tasks.append((shap_vals[idx], _data, self.features[idx], f"{name}_{idx}"))
+
+        if self.show or len(tasks) == 1:
+            for task in tasks:
+                _summary_plot(*task)
+        else:
+            # figure creation goes through pyplot's global state and therefore
+            # must be serialized but savefig releases the GIL during png
+            # encoding, so the writes of many figures can overlap
+            lock = threading.Lock()
+
+            def _render(task):
+                _shap_val, _data, _features, _name = task
+                with lock:
+                    fig = _make_summary_fig(_shap_val, _data, _features)
+                if self.save:
+                    fig.savefig(os.path.join(self.path, _name + " _bar"), dpi=self.dpi, bbox_inches="tight",
+                                pil_kwargs={'compress_level': 1})
+                return
+
+            with ThreadPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as executor:
+                list(executor.map(_render, tasks))
 
         return
 
+    def _can_parallelize(self) -> bool:
+        """whether ``self`` can be shipped to loky worker processes. Deep and
+        Gradient explainers hold keras models and graph tensors which do not
+        survive the pickling round trip, so DL explainers plot sequentially."""
+        return self._framework != "DL"
+
+    def _prepare_force_context(self) -> tuple:
+        """computes those quantities for force plot which do not change
+        across examples so that they are not recomputed inside per-example
+        loops."""
+        shap_vals = self.shap_values
+
+        if self.explainer.__class__.__name__ == "Gradient":
+            expected_value = [0]
+        else:
+            expected_value = self._expected_value
+
+        return shap_vals, expected_value, self.features, self.unrolled_features
+
     def force_plot_single_example(
             self,
             idx:int,
             name=None,
+            _ctx: tuple = None,
             **force_kws
     ):
         """Draws force_plot_
@@ -460,6 +798,9 @@ class ShapExplainer(ExplainerMixin):
                 index of exmaple to use. It can be any value >=0
             name:
                 name of saved file
+            _ctx:
+                output of ``_prepare_force_context``. Used to avoid recomputing
+                example-invariant quantities when this method is called in a loop.
             force_kws : any keyword argument for force plot
 
         Returns:
@@ -469,10 +810,9 @@ class ShapExplainer(ExplainerMixin):
             https://shap.readthedocs.io/en/latest/generated/shap.plots.force.html
         """
 
-        shap_vals = self.shap_values
-
-        if isinstance(shap_vals, list) and len(shap_vals) == 1:
-            shap_vals = shap_vals[0]
+        if _ctx is None:
+            _ctx = self._prepare_force_context()
+        shap_vals, expected_value, features, unrolled_features = _ctx
 
         shap_vals = shap_vals[idx]
 
@@ -481,14 +821,8 @@ class ShapExplainer(ExplainerMixin):
         else:
             data = self.data.iloc[idx, :]
 
-        if self.explainer.__class__.__name__ == "Gradient":
-            expected_value = [0]
-        else:
-            expected_value = self.explainer.expected_value
-
-        features = self.features
         if data.ndim == 2 and shap_vals.ndim == 2:  # input was 3d i.e. ml model uses 3d input
-            features = self.unrolled_features
+            features = unrolled_features
             expected_value = expected_value[0]  # todo
             shap_vals = shap_vals.reshape(-1,)
             data = data.reshape(-1, )
@@ -507,7 +841,8 @@ class ShapExplainer(ExplainerMixin):
 
         if self.save:
             name = name or f"force_plot_{idx}"
-            plotter.savefig(os.path.join(self.path, name), dpi=300, bbox_inches="tight")
+            plotter.savefig(os.path.join(self.path, name), dpi=self.dpi, bbox_inches="tight",
+                        pil_kwargs={'compress_level': 1})
 
         if self.show:
             plotter.show()
@@ -516,9 +851,15 @@ class ShapExplainer(ExplainerMixin):
 
     def dependence_plot_all_features(self, **dependence_kws):
         """dependence plot for all features"""
-        for feature in self.features:
-            self.dependence_plot_single_feature(feature, f"dependence_plot_{feature}",
-                                                **dependence_kws)
+        if self.show or not self._can_parallelize():
+            for feature in self.features:
+                self.dependence_plot_single_feature(feature, f"dependence_plot_{feature}",
+                                                    **dependence_kws)
+        else:
+            Parallel(n_jobs=-1, backend="loky")(
+                delayed(self.dependence_plot_single_feature)(feature, f"dependence_plot_{feature}",
+                                                             **dependence_kws)
+                for feature in self.features)
         return
 
     def dependence_plot_single_feature(self, feature, name="dependence_plot", **kwargs):
@@ -535,16 +876,15 @@ class ShapExplainer(ExplainerMixin):
             name = name[0:150]
 
         shap_values = self.shap_values
-        if isinstance(shap_values, list) and len(shap_values) == 1:
-            shap_values = shap_values[0]
 
         shap.dependence_plot(feature,
                              shap_values,
-                             self.data,
+                             self._data_df,
                              show=False,
                              **kwargs)
         if self.save:
-            plt.savefig(os.path.join(self.path, name), dpi=300, bbox_inches="tight")
+            plt.savefig(os.path.join(self.path, name), dpi=self.dpi, bbox_inches="tight",
+                        pil_kwargs={'compress_level': 1})
         if self.show:
             plt.show()
         return
@@ -558,10 +898,8 @@ class ShapExplainer(ExplainerMixin):
             return
 
         shap_values = self.shap_values
-        if isinstance(shap_values, list) and len(shap_values) == 1:
-            shap_values = shap_values[0]
         plt.close('all')
-        plot = shap.force_plot(self.explainer.expected_value, shap_values, self.data, **force_kws)
+        plot = shap.force_plot(self._expected_value, shap_values, self.data, **force_kws)
         if save:
             shap.save_html(os.path.join(self.path, name), plot)
 
@@ -579,11 +917,28 @@ class ShapExplainer(ExplainerMixin):
         .. _waterfall:
             https://shap.readthedocs.io/en/latest/generated/shap.plots.waterfall.html
         """
-        for i in range(len(self.data)):
-            self.waterfall_plot_single_example(i, name=name, **waterfall_kws)
+        # the Explanation is same for all examples so compute it once
+        # instead of once per example
+        shap_vals_as_exp = self._shap_values_as_explanation()
+
+        if self.show or not self._can_parallelize():
+            for i in range(len(self.data)):
+                self._waterfall_plot_single_example(i, shap_vals_as_exp, name=name, **waterfall_kws)
+        else:
+            Parallel(n_jobs=-1, backend="loky")(
+                delayed(self._waterfall_plot_single_example)(i, shap_vals_as_exp, name=name,
+                                                             **waterfall_kws)
+                for i in range(len(self.data)))
 
         return
 
+    def _shap_values_as_explanation(self):
+        """Returns the cached Explanation over whole data or None for those
+        explainers which can not provide it."""
+        if self.explainer.__class__.__name__ in ["Deep", "Kernel"]:
+            return None
+        return self._explanation
+
     def waterfall_plot_single_example(
             self,
             example_index: int,
@@ -611,14 +966,21 @@ class ShapExplainer(ExplainerMixin):
         .. _waterfall:
             https://shap.readthedocs.io/en/latest/generated/shap.plots.waterfall.html
         """
-        if self.explainer.__class__.__name__ in ["Deep", "Kernel"]:
-            shap_vals_as_exp = None
-        else:
-            shap_vals_as_exp = self.explainer(self.data)
+        return self._waterfall_plot_single_example(
+            example_index,
+            self._shap_values_as_explanation(),
+            name=name,
+            max_display=max_display)
 
+    def _waterfall_plot_single_example(
+            self,
+            example_index: int,
+            shap_vals_as_exp,
+            name: str = "waterfall",
+            max_display: int = 10,
+    ):
+        """draws waterfall plot for one example given precomputed Explanation."""
         shap_values = self.shap_values
-        if isinstance(shap_values, list) and len(shap_values) == 1:
-            shap_values = shap_values[0]
 
         plt.close('all')
 
@@ -636,9 +998,9 @@ class ShapExplainer(ExplainerMixin):
                 data = self.data[example_index].reshape(-1, )
             else:
                 values = shap_values[example_index]
-                data = self.data.iloc[example_index]
+                data = self._data_df.iloc[example_index]
 
-            exp_value = self.explainer.expected_value
+            exp_value = self._expected_value
             if self.explainer.__class__.__name__ in ["Kernel"]:
                 pass
             else:
@@ -657,8 +1019,8 @@ class ShapExplainer(ExplainerMixin):
 
         if self.save:
             plt.savefig(os.path.join(self.path, f"{name}_{example_index}"),
-                        dpi=300,
-                        bbox_inches="tight")
+                        dpi=self.dpi, bbox_inches="tight",
+                        pil_kwargs={'compress_level': 1})
 
         if self.show:
             plt.show()
@@ -672,15 +1034,20 @@ class ShapExplainer(ExplainerMixin):
             **scatter_kws
     ):
         """scatter plot for a single feature"""
-        if self.explainer.__class__.__name__ in ["Kernel"]:
-            shap_values = Explanation(self.shap_values, data=self.data.values,
-                                      feature_names=self.features)
-        else:
-            shap_values = self.explainer(self.data)
+        return self._scatter_plot_single(feature, self._explanation, name=name, **scatter_kws)
 
+    def _scatter_plot_single(
+            self,
+            feature,
+            shap_values,
+            name: str = "scatter",
+            **scatter_kws
+    ):
+        """scatter plot for a single feature given precomputed Explanation"""
         shap.plots.scatter(shap_values[:, feature], show=False, **scatter_kws)
         if self.save:
-            plt.savefig(os.path.join(self.path, f"{name}_{feature}"), dpi=300, bbox_inches="tight")
+            plt.savefig(os.path.join(self.path, f"{name}_{feature}"), dpi=self.dpi, bbox_inches="tight",
+                        pil_kwargs={'compress_level': 1})
         if self.show:
             plt.show()
 
@@ -688,13 +1055,21 @@ class ShapExplainer(ExplainerMixin):
 
     def scatter_plot_all_features(self, name="scatter_plot", **scatter_kws):
         """draws scatter plot for all features"""
-        if isinstance(self.data, pd.DataFrame):
+        if self.data_is_2d:
             features = self.features
         else:
             features = [i for i in range(self.data.shape[-1])]
 
-        for feature in features:
-            self.scatter_plot_single_feature(feature, name=name, **scatter_kws)
+        # the Explanation is same for all features so compute/fetch it once
+        shap_values = self._explanation
+
+        if self.show or not self._can_parallelize():
+            for feature in features:
+                self._scatter_plot_single(feature, shap_values, name=name, **scatter_kws)
+        else:
+            Parallel(n_jobs=-1, backend="loky")(
+                delayed(self._scatter_plot_single)(feature, shap_values, name=name, **scatter_kws)
+                for feature in features)
 
         return
 
@@ -716,16 +1091,7 @@ class ShapExplainer(ExplainerMixin):
             https://shap.readthedocs.io/en/latest/example_notebooks/api_examples/plots/heatmap.html
         """
 
-        # if heat map is drawn with np.ndarray, it throws errors therefore convert
-        # it into pandas DataFrame. It is more interpretable and does not hurt.
-        try:
-            shap_values = self._get_shap_values_locally()
-        except (ValueError, AttributeError):  # some times we are not able to calculate shap values as
-            # being calcultaed inside '_get_shap_values_locally'
-            shap_values = Explanation(
-                self.shap_values,
-                data=self.data.values,
-                feature_names=self.features)
+        shap_values = self._explanation
 
         # by default examples are ordered in such a way that examples with similar
         # explanations are grouped together.
@@ -752,17 +1118,20 @@ class ShapExplainer(ExplainerMixin):
         plt.xlabel("Examples")
 
         if self.save:
-            plt.savefig(os.path.join(self.path, f"{name}_sortby_SumOfShap"), dpi=300,
-                        bbox_inches="tight")
+            plt.savefig(os.path.join(self.path, f"{name}_sortby_SumOfShap"), dpi=self.dpi, bbox_inches="tight",
+                        pil_kwargs={'compress_level': 1})
 
         if self.show:
             plt.show()
         return
 
+    @cached_property
+    def _data_df(self) -> pd.DataFrame:
+        """DataFrame view of data, built only when a plot requires pandas"""
+        return maybe_to_dataframe(self.data, self.features)
+
     def _get_shap_values_locally(self):
-        data = self.data
-        if not isinstance(self.data, pd.DataFrame) and data.ndim == 2:
-            data = pd.DataFrame(self.data, columns=self.features)
+        data = self._data_df
 
         # not using global explainer because, this explainer should data as well
         explainer = shap.Explainer(self.model, data)
@@ -770,6 +1139,33 @@ class ShapExplainer(ExplainerMixin):
 
         return shap_values
 
+    @cached_property
+    def _explanation(self) -> "Explanation":
+        """Explanation object over whole data, computed only once and shared
+        between heatmap, beeswarm and waterfall plots."""
+        if self._explanation_from_explainer is not None:
+            return self._explanation_from_explainer
+        if isinstance(self.shap_values, Explanation):
+            return self.shap_values
+
+        exp_value = self._expected_value
+        if isinstance(self.shap_values, np.ndarray) and self.shap_values.ndim == 2 \
+                and exp_value is not None:
+            # wrap the already computed shap_values instead of evaluating
+            # the explainer over whole data again
+            base_values = np.full(len(self.shap_values), np.ravel(exp_value)[0])
+            return Explanation(
+                self.shap_values,
+                base_values=base_values,
+                data=self._data_ndarray,
+                feature_names=self.features)
+
+        try:
+            return self._get_shap_values_locally()
+        except (ValueError, AttributeError):
+            return Explanation(self.shap_values, data=self._data_ndarray,
+                               feature_names=self.features)
+
     def beeswarm_plot(
             self,
             name: str = "beeswarm",
@@ -791,11 +1187,7 @@ class ShapExplainer(ExplainerMixin):
             https://shap.readthedocs.io/en/latest/example_notebooks/api_examples/plots/beeswarm.html
         """
 
-        try:
-            shap_values = self._get_shap_values_locally()
-        except (ValueError, AttributeError):
-            shap_values = Explanation(self.shap_values, data=self.data.values,
-                                      feature_names=self.features)
+        shap_values = self._explanation
 
         self._beeswarm_plot(shap_values,
                             name=f"{name}_basic",
@@ -822,7 +1214,8 @@ class ShapExplainer(ExplainerMixin):
                             max_display=max_display,
                             **kwargs)
         if self.save:
-            plt.savefig(os.path.join(self.path, name), dpi=300, bbox_inches="tight")
+            plt.savefig(os.path.join(self.path, name), dpi=self.dpi, bbox_inches="tight",
+                        pil_kwargs={'compress_level': 1})
 
         if self.show:
             plt.show()
@@ -851,8 +1244,10 @@ class ShapExplainer(ExplainerMixin):
                 legend_labels = indices
                 legend_location = "lower right"
 
-        if self.explainer.__class__.__name__ in ["Tree"]:
-            shap.decision_plot(self.explainer.expected_value,
+        # fasttreeshap's tree explainer is named TreeExplainer while shap's
+        # is named Tree; both provide what decision_plot needs
+        if self.explainer.__class__.__name__ in ["Tree", "TreeExplainer"]:
+            shap.decision_plot(self._expected_value,
                                shap_values,
                                self.features,
                                legend_labels=legend_labels,
@@ -860,7 +1255,8 @@ class ShapExplainer(ExplainerMixin):
                                legend_location=legend_location,
                                **decision_kwargs)
             if self.save:
-                plt.savefig(os.path.join(self.path, name), dpi=300, bbox_inches="tight")
+                plt.savefig(os.path.join(self.path, name), dpi=self.dpi, bbox_inches="tight",
+                        pil_kwargs={'compress_level': 1})
             if self.show:
                 plt.show()
         else:
@@ -884,9 +1280,6 @@ class ShapExplainer(ExplainerMixin):
         """
         shap_values = self.shap_values
 
-        if isinstance(shap_values, list) and len(shap_values) == 1:
-            shap_values: np.ndarray = shap_values[0]
-
         def plot_shap_values_single_source(_data, _shap_vals, _features, _name):
             if _data.ndim == 3 and _shap_vals.ndim == 3:  # input is 3d
                 # assert _shap_vals.ndim == 3
@@ -896,15 +1289,38 @@ class ShapExplainer(ExplainerMixin):
                                  name=_name,
                                  path=self.path,
                                  show=self.show,
-                                 cmap=cmap)
+                                 cmap=cmap,
+                                 dpi=self.dpi)
 
-            plt.close('all')
-            fig, axis = plt.subplots()
-            im = axis.imshow(_shap_vals.T,
-                             aspect='auto',
-                             interpolation=interpolation,
-                             cmap=cmap
-                             )
+            if self.show:
+                plt.close('all')
+                fig, axis = plt.subplots()
+            else:
+                # an Agg figure bypasses the pyplot figure registry and the
+                # GUI backend machinery entirely
+                fig = Figure()
+                FigureCanvasAgg(fig)
+                axis = fig.add_subplot()
+            if interpolation is None:
+                # pcolormesh over a contiguous array draws much faster than
+                # imshow on the strided transpose; beyond ~2000 examples the
+                # columns cannot be resolved on screen, so stride-downsample
+                # the x axis while keeping true example indices
+                vals = np.ascontiguousarray(_shap_vals.T)
+                step = max(1, vals.shape[1] // 2000)
+                xs = np.arange(0, vals.shape[1], step)
+                im = axis.pcolormesh(xs,
+                                     np.arange(vals.shape[0]),
+                                     vals[:, ::step],
+                                     cmap=cmap,
+                                     shading='auto')
+                axis.invert_yaxis()
+            else:
+                im = axis.imshow(_shap_vals.T,
+                                 aspect='auto',
+                                 interpolation=interpolation,
+                                 cmap=cmap
+                                 )
             if _features is not None:  # if imshow is successful then don't worry if features are None
                 axis.set_yticks(np.arange(len(_features)))
                 axis.set_yticklabels(_features)
@@ -913,7 +1329,8 @@ class ShapExplainer(ExplainerMixin):
 
             fig.colorbar(im)
             if self.save:
-                plt.savefig(os.path.join(self.path, _name), dpi=300, bbox_inches="tight")
+                fig.savefig(os.path.join(self.path, _name), dpi=self.dpi, bbox_inches="tight",
+                        pil_kwargs={'compress_level': 1})
 
             if self.show:
                 plt.show()
@@ -939,11 +1356,23 @@ class ShapExplainer(ExplainerMixin):
             pdp_kws:
                 any keyword arguments
             """
+        self._maybe_set_booster_feature_names()
+
         for feat in self.features:
             self.pdp_single_feature(feat, **pdp_kws)
 
         return
 
+    def _maybe_set_booster_feature_names(self):
+        # reading the booster out of an xgboost model and renaming its
+        # features is not free; do it once instead of once per feature
+        if getattr(self, '_booster_named', False):
+            return
+        if self.model.__class__.__name__.startswith("XGB"):
+            self.model.get_booster().feature_names = self.features
+        self._booster_named = True
+        return
+
     def pdp_single_feature(
             self,
             feature_name: str,
@@ -951,17 +1380,20 @@ class ShapExplainer(ExplainerMixin):
     ):
         """partial depence plot using SHAP package for a single feature."""
 
-        shap_values = None
-        if hasattr(self.shap_values, 'base_values'):
-            shap_values = self.shap_values
+        shap_values = self.shap_values
+        if not hasattr(shap_values, 'base_values'):
+            # reuse the cached Explanation so that shap does not recompute
+            # the values internally for every feature
+            shap_values = self._explanation
+        if getattr(shap_values, 'base_values', None) is None:
+            shap_values = None
 
-        if self.model.__class__.__name__.startswith("XGB"):
-            self.model.get_booster().feature_names = self.features
+        self._maybe_set_booster_feature_names()
 
         fig = shap.partial_dependence_plot(
             feature_name,
             model=self.model.predict,
-            data=self.data,
+            data=self._data_df,
             model_expected_value=True,
             feature_expected_value=True,
             shap_values=shap_values,
@@ -972,7 +1404,8 @@ class ShapExplainer(ExplainerMixin):
 
         if self.save:
             fname = f"pdp_{feature_name}"
-            plt.savefig(os.path.join(self.path, fname), dpi=300, bbox_inches="tight")
+            plt.savefig(os.path.join(self.path, fname), dpi=self.dpi, bbox_inches="tight",
+                        pil_kwargs={'compress_level': 1})
         if self.show:
             plt.show()
 
@@ -986,17 +1419,47 @@ def imshow_3d(values,
               name="",
               show=False,
               cmap=None,
+              dpi=150,
               ):
 
     num_examples, lookback, input_features = values.shape
     assert data.shape == values.shape
 
+    yticklabels = [f"t-{int(i)}" for i in np.linspace(lookback - 1, 0, lookback)]
+
+    # transpose both arrays once so every per-feature (lookback, examples)
+    # slice is a contiguous block instead of a strided view that imshow
+    # (or pickling to a worker) has to gather element by element
+    data_t = np.ascontiguousarray(np.transpose(data, (2, 1, 0)))
+    values_t = np.ascontiguousarray(np.transpose(values, (2, 1, 0)))
+
+    if not show:
+        # rendering is embarrassingly parallel across features; each worker
+        # process receives only the two 2d slices it needs
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [
+                executor.submit(_render_feature_3d,
+                                feat,
+                                data_t[idx],
+                                values_t[idx],
+                                yticklabels, path, name, vmin, vmax, cmap, dpi)
+                for idx, feat in enumerate(feature_names)]
+            for future in futures:
+                future.result()
+        return
+
+    plt.close('all')
+    # one figure, axes pair and colorbar pair are reused for all features;
+    # building and tearing them down per feature dominates runtime when
+    # input features are many
+    fig, (ax1, ax2) = plt.subplots(2, sharex='all', figsize=(10, 12))
+    cb1, cb2 = None, None
+
     for idx, feat in enumerate(feature_names):
-        plt.close('all')
-        fig, (ax1, ax2) = plt.subplots(2, sharex='all', figsize=(10, 12))
+        ax1.cla()
+        ax2.cla()
 
-        yticklabels=[f"t-{int(i)}" for i in np.linspace(lookback - 1, 0, lookback)]
-        axis, im = easy_mpl.imshow(data[:, :, idx].transpose(),
+        _, im1 = easy_mpl.imshow(data_t[idx],
                           yticklabels=yticklabels,
                           ax=ax1,
                           vmin=vmin,
@@ -1005,9 +1468,8 @@ def imshow_3d(values,
                           cmap=cmap,
                           show=False
                           )
-        fig.colorbar(im, ax=axis, orientation='vertical', pad=0.2)
 
-        axis, im = easy_mpl.imshow(values[:, :, idx].transpose(),
+        _, im2 = easy_mpl.imshow(values_t[idx],
                           yticklabels=yticklabels,
                           vmin=vmin, vmax=vmax,
                           xlabel="Examples",
@@ -1016,38 +1478,106 @@ def imshow_3d(values,
                           show=False,
                           ax=ax2)
 
-        fig.colorbar(im, ax=axis, orientation='vertical', pad=0.2)
+        if cb1 is None:
+            cb1 = fig.colorbar(im1, ax=ax1, orientation='vertical', pad=0.2)
+            cb2 = fig.colorbar(im2, ax=ax2, orientation='vertical', pad=0.2)
+        else:
+            cb1.update_normal(im1)
+            cb2.update_normal(im2)
 
         _name = f'{name}_{feat}_shap_values'
-        plt.savefig(os.path.join(path, _name), dpi=400, bbox_inches='tight')
+        fig.savefig(os.path.join(path, _name), dpi=dpi, bbox_inches='tight',
+                    pil_kwargs={'compress_level': 1})
 
         if show:
             plt.show()
+
+    plt.close(fig)
+    return
+
+
+def _render_feature_3d(feat, data_slice, values_slice, yticklabels,
+                       path, name, vmin, vmax, cmap, dpi=150):
+    """renders the imshow pair of a single feature; runs in a worker process"""
+    # build the figure without pyplot so that no per-process figure registry
+    # or interactive backend is ever touched
+    fig = Figure(figsize=(10, 12))
+    FigureCanvasAgg(fig)
+    ax1, ax2 = fig.subplots(2, sharex='all')
+
+    _, im1 = easy_mpl.imshow(data_slice,
+                             yticklabels=yticklabels,
+                             ax=ax1,
+                             vmin=vmin,
+                             vmax=vmax,
+                             title=feat,
+                             cmap=cmap,
+                             show=False)
+    fig.colorbar(im1, ax=ax1, orientation='vertical', pad=0.2)
+
+    _, im2 = easy_mpl.imshow(values_slice,
+                             yticklabels=yticklabels,
+                             vmin=vmin, vmax=vmax,
+                             xlabel="Examples",
+                             title=f"SHAP Values",
+                             cmap=cmap,
+                             show=False,
+                             ax=ax2)
+    fig.colorbar(im2, ax=ax2, orientation='vertical', pad=0.2)
+
+    fig.savefig(os.path.join(path, f'{name}_{feat}_shap_values'),
+                dpi=dpi, bbox_inches='tight',
+                pil_kwargs={'compress_level': 1})
     return
 
 
 def infer_framework(model):
     if hasattr(model, 'config') and 'backend' in model.config:
-        framework = model.config['backend']
+        return model.config['backend']
 
-    elif type(model) is tuple:
-        a, _ = model
-        try:
-            a.named_parameters()
-            framework = 'pytorch'
-        except:
-            framework = 'tensorflow'
-    else:
-        try:
-            model.named_parameters()
-            framework = 'pytorch'
-        except:
-            framework = 'tensorflow'
+    if type(model) is tuple:
+        model, _ = model
+
+    # isinstance checks are cheap; calling named_parameters() on a keras
+    # model just to catch the AttributeError builds the exception machinery
+    # on every call
+    try:
+        import torch
+    except ModuleNotFoundError:
+        torch = None
+
+    if torch is not None and isinstance(model, torch.nn.Module):
+        return 'pytorch'
+
+    try:
+        import tensorflow as tf
+    except ModuleNotFoundError:
+        tf = None
+
+    if tf is not None and isinstance(model, (tf.keras.Model, tf.Module)):
+        return 'tensorflow'
+
+    # fall back to the old duck-typing for wrappers that hide the base class
+    try:
+        model.named_parameters()
+        framework = 'pytorch'
+    except:
+        framework = 'tensorflow'
 
     return framework
 
 
+def cuda_available() -> bool:
+    """whether a cuda device is available or not"""
+    try:
+        import cupy
+        return cupy.cuda.runtime.getDeviceCount() > 0
+    except Exception:
+        return False
+
+
 def maybe_to_dataframe(data, features=None) -> pd.DataFrame:
     if isinstance(data, np.ndarray) and isinstance(features, list) and data.ndim == 2:
-        data = pd.DataFrame(data, columns=features)
+        # copy=False wraps the existing ndarray instead of duplicating it
+        data = pd.DataFrame(data, columns=features, copy=False)
     return data
@@ -1,12 +1,15 @@
 
 from typing import Union
 
+import joblib
+from joblib import Parallel, delayed
+
 from ...preprocessing import DataSet
 from ._shap import ShapExplainer, shap
 from ._lime import LimeExplainer, lime
 from ..utils import choose_examples
 from .utils import convert_ai4water_model, get_features
-from ai4water.backend import os
+from ai4water.backend import os, np
 
 def explain_model(
         model,
@@ -50,10 +53,20 @@ def explain_model(
     """
     if method == 'both':
 
-        exp1 = _explain_with_lime(model, examples_to_explain)
+        # fetch the data and convert the model once; both explainers need
+        # the same training/test arrays and the same converted model
+        train_x, _ = model.training_data()
+        test_x, test_y = model.test_data()
+        converted = convert_ai4water_model(model)
+
+        exp1 = _explain_with_lime(model, examples_to_explain,
+                                  _data=(train_x, test_x, test_y),
+                                  _converted=converted)
 
         exp2 = _explain_with_shap(model, features_to_explain,
-                                  examples_to_explain,  explainer, layer)
+                                  examples_to_explain,  explainer, layer,
+                                  _data=(train_x, test_x, test_y),
+                                  _converted=converted)
         explainer = (exp1, exp2)
 
     elif method == 'shap' and shap:
@@ -72,6 +85,8 @@ def explain_model(
 def explain_model_with_lime(
         model,
         examples_to_explain: Union[int, float, list] = 20,
+        _data: tuple = None,
+        _converted: tuple = None,
 ) -> "LimeExplainer":
     """Explains the model with LimeExplainer
 
@@ -93,8 +108,11 @@ def explain_model_with_lime(
     """
 
     features = model.input_features
-    train_x, _ = model.training_data()
-    test_x, test_y = model.test_data()
+    if _data is None:
+        train_x, _ = model.training_data()
+        test_x, test_y = model.test_data()
+    else:
+        train_x, test_x, test_y = _data
 
     lime_exp_path = maybe_make_path(os.path.join(model.path, "explainability", "lime"))
 
@@ -107,7 +125,7 @@ def explain_model_with_lime(
     else:
         explainer = "LimeTabularExplainer"
 
-    model, _, _, _ = convert_ai4water_model(model)
+    model, framework, _, _ = _converted or convert_ai4water_model(model)
 
     if mode == "classification":
         return
@@ -123,18 +141,40 @@ def explain_model_with_lime(
                               show=False
                               )
 
-    for i in range(explainer.data.shape[0]):
-        explainer.explain_example(i, name=f"lime_exp_for_{index[i]}")
+    # each example renders and saves an independent figure; the explainer was
+    # built with show=False so distribute the rendering across processes.
+    # DL models do not survive the pickling round trip to loky workers, so
+    # they keep the sequential loop
+    if framework == "DL":
+        for i in range(explainer.data.shape[0]):
+            explainer.explain_example(i, name=f"lime_exp_for_{index[i]}")
+    else:
+        results = Parallel(n_jobs=-1, backend="loky")(
+            delayed(_lime_example_worker)(explainer, i, f"lime_exp_for_{index[i]}")
+            for i in range(explainer.data.shape[0]))
+        # the workers mutate their own copies of the explainer; carry the
+        # explanation objects back so the parent keeps the side effect
+        explainer.explaination_objects.update(dict(results))
 
     return explainer
 
 
+def _lime_example_worker(explainer, i, name):
+    """renders one lime example in a worker process and returns its
+    explanation object so that the parent process can keep it."""
+    explainer.explain_example(i, name=name)
+    return i, explainer.explaination_objects[i]
+
+
 def explain_model_with_shap(
         model,
         features_to_explain: Union[str, list] = None,
         examples_to_explain: Union[int, float, list] = 20,
         explainer=None,
         layer: Union[str, int] = None,
+        max_individual_plots: int = 50,
+        _data: tuple = None,
+        _converted: tuple = None,
 ) -> "ShapExplainer":
     """Expalins the model which is built by AI4Water's Model class using SHAP.
 
@@ -148,6 +188,8 @@ def explain_model_with_shap(
             in prediction.
         explainer :
         layer : layer to explain.
+        max_individual_plots : maximum number of per-example force plots to
+            draw. The summary plots still cover all chosen examples.
 
     Returns:
         an instance of ShapExplainer
@@ -161,9 +203,17 @@ def explain_model_with_shap(
         >>> explain_model_with_shap(model)
     """
     assert hasattr(model, 'path')
-
-    train_x, _ = model.training_data()
-    test_x, test_y = model.test_data()
+    # key on the saved config file; the run directory's own mtime changes as
+    # soon as plots are written into it, which would defeat the cache
+    config_fpath = os.path.join(model.path, "config.json")
+    model_mtime = os.path.getmtime(
+        config_fpath if os.path.exists(config_fpath) else model.path)
+
+    if _data is None:
+        train_x, _ = model.training_data()
+        test_x, test_y = model.test_data()
+    else:
+        train_x, test_x, test_y = _data
     features = model.input_features
 
     shap_exp_path = maybe_make_path(os.path.join(model.path, "explainability", "shap"))
@@ -173,7 +223,7 @@ def explain_model_with_shap(
 
     features_to_explain = get_features(features, features_to_explain)
 
-    model, framework, _explainer, _ = convert_ai4water_model(model)
+    model, framework, _explainer, _ = _converted or convert_ai4water_model(model)
 
     if framework == "DL":
         layer = layer or 2
@@ -182,19 +232,63 @@ def explain_model_with_shap(
 
     test_x, index = choose_examples(test_x, examples_to_explain, test_y)
 
-    explainer = ShapExplainer(model=model,
-                              data=test_x,
-                              train_data=train_x,
-                              explainer=explainer,
-                              path=shap_exp_path,
-                              framework=framework,
-                              feature_names=features_to_explain,
-                              layer=layer,
-                              show=False
-                              )
+    # computing shap values is by far the most expensive step here; persist
+    # the fitted explainer next to its plots and reuse it as long as neither
+    # the model nor the data selection has changed
+    cache_key = (model_mtime,
+                 tuple(features_to_explain),
+                 getattr(train_x, 'shape', None),
+                 getattr(test_x, 'shape', None),
+                 str(explainer), layer)
+    cache_fpath = os.path.join(shap_exp_path, "explainer.joblib")
+
+    cached = None
+    if os.path.exists(cache_fpath):
+        try:
+            cached = joblib.load(cache_fpath)
+        except Exception:  # stale/unreadable cache is not an error
+            cached = None
+
+    if cached is not None and cached.get("key") == cache_key:
+        explainer = cached["explainer"]
+    else:
+        explainer = ShapExplainer(model=model,
+                                  data=test_x,
+                                  train_data=train_x,
+                                  explainer=explainer,
+                                  path=shap_exp_path,
+                                  framework=framework,
+                                  feature_names=features_to_explain,
+                                  layer=layer,
+                                  show=False
+                                  )
+        try:
+            joblib.dump({"key": cache_key, "explainer": explainer}, cache_fpath)
+        except Exception:  # some wrapped models do not pickle; skip caching
+            pass
+
+    num_examples = explainer.data.shape[0]
+    if num_examples > max_individual_plots:
+        # per-example figures do not scale with sample size; draw them only
+        # for the examples with the largest total shap impact
+        shap_vals = explainer.shap_values
+        if isinstance(shap_vals, list):
+            shap_vals = shap_vals[0]
+        values = getattr(shap_vals, "values", shap_vals)
+        impact = np.abs(values.reshape(num_examples, -1)).sum(axis=1)
+        plot_indices = np.argsort(impact)[-max_individual_plots:]
+    else:
+        plot_indices = range(num_examples)
 
-    for i in range(explainer.data.shape[0]):
-        explainer.force_plot_single_example(i, f"force_plot_{index[i]}")
+    ctx = explainer._prepare_force_context()
+    if explainer._can_parallelize():
+        Parallel(n_jobs=-1, backend="loky")(
+            delayed(explainer.force_plot_single_example)(i, f"force_plot_{index[i]}", _ctx=ctx)
+            for i in plot_indices)
+    else:
+        # Deep/Gradient explainers hold graph tensors which do not pickle
+        for i in plot_indices:
+            explainer.force_plot_single_example(i, f"force_plot_{index[i]}", _ctx=ctx)
 
     explainer.summary_plot()
     explainer.plot_shap_values()
@@ -156,25 +156,39 @@ def murphy_diagram(
 
     line_colors = line_colors or ["dimgrey", "tab:orange"]
 
+    # float32 is ample for plotting and halves the memory traffic through
+    # the two 501xN score matrices
+    y = y.astype(np.float32, copy=False)
+    f1 = f1.astype(np.float32, copy=False)
+    if f2 is not None:
+        f2 = f2.astype(np.float32, copy=False)
+
     n = len(y)
-    _min, _max = np.nanmin(np.hstack([y, f1, f2])), np.nanmax(np.hstack([y, f1, f2]))
+    # take extrema per array instead of concatenating everything twice
+    arrays = [y, f1] if f2 is None else [y, f1, f2]
+    _min = min(np.nanmin(a) for a in arrays)
+    _max = max(np.nanmax(a) for a in arrays)
     tmp = _min-0.2*(_max-_min), _max+0.2*(_max-_min)
 
-    theta = np.linspace(tmp[0], tmp[1], 501)
-
-    s1 = np.full((501, n), np.nan)
-    s2 = np.full((501, n), np.nan)
+    theta = np.linspace(tmp[0], tmp[1], 501, dtype=np.float32)
 
     max1 = np.maximum(f1, y)
-    max2 = np.maximum(f2, y)
-
     min1 = np.minimum(f1, y)
-    min2 = np.minimum(f2, y)
 
-    for j in range(n):
+    # broadcast theta against all examples at once instead of looping over
+    # examples in python
+    theta_col = theta[:, np.newaxis]
+    abs_diff = np.abs(y[np.newaxis, :] - theta_col)
 
-        s1[:, j] = abs(y[j]-theta) * (max1[j] > theta) * (min1[j] <= theta)
-        s2[:, j] = abs(y[j] - theta) * (max2[j] > theta) * (min2[j] <= theta)
+    s1 = abs_diff * (max1[np.newaxis, :] > theta_col) * (min1[np.newaxis, :] <= theta_col)
+
+    # without a reference prediction only the scores of f1 can be drawn
+    if f2 is None:
+        s2 = None
+    else:
+        max2 = np.maximum(f2, y)
+        min2 = np.minimum(f2, y)
+        s2 = abs_diff * (max2[np.newaxis, :] > theta_col) * (min2[np.newaxis, :] <= theta_col)
 
     # grab the axes
     if ax is None:
@@ -201,6 +215,12 @@ def murphy_diagram(
 
 
 def last_nonzero(arr, axis, invalid_val=-1):
+    if arr.ndim == 1:
+        # flatnonzero scans the array forward and contiguously instead of
+        # argmax-ing over a reversed view
+        nonzero = np.flatnonzero(arr)
+        return nonzero[-1] if nonzero.size else invalid_val
+
     mask = arr != 0
     val = arr.shape[axis] - np.flip(mask, axis=axis).argmax(axis=axis) - 1
     return np.where(mask.any(axis=axis), val, invalid_val)
@@ -208,9 +228,13 @@ def last_nonzero(arr, axis, invalid_val=-1):
 
 def _plot_diff(theta, s1, s2, n, ax, line_color="black", fill_color="lightgray"):
 
-    se = np.std(s1-s2)/np.sqrt(n)
+    # the score matrices are not needed afterwards, so take the difference
+    # once in place and derive both statistics from it
+    d = np.subtract(s1, s2, out=s1)
+
+    se = np.std(d)/np.sqrt(n)
 
-    diff = np.mean(s1-s2, axis=1)
+    diff = np.mean(d, axis=1)
 
     upper = diff + 1.96 * se
     lower = diff - 1.96 * se
@@ -219,7 +243,7 @@ def _plot_diff(theta, s1, s2, n, ax, line_color="black", fill_color="lightgray")
 
     # first_nonzero occurence
     st = (diff != 0).argmax(axis=0)
-    en = last_nonzero(diff, axis=0).item()
+    en = int(last_nonzero(diff, axis=0))
 
     ax.fill_between(theta[st:en], upper[st:en], lower[st:en],  # alpha=0.2,
                     color=fill_color)
@@ -267,13 +291,19 @@ def fdc_plot(
         >>> plt.show()
     """
 
-    sim = to_1d_array(sim)
-    obs = to_1d_array(obs)
+    sim = np.asarray(to_1d_array(sim), dtype=np.float32)
+    obs = np.asarray(to_1d_array(obs), dtype=np.float32)
 
-    sort_obs = np.sort(sim)[::-1]
-    exceedence_obs = np.arange(1., len(sort_obs)+1) / len(sort_obs)
-    sort_sim = np.sort(obs)[::-1]
-    exceedence_sim = np.arange(1., len(sort_sim)+1) / len(sort_sim)
+    # sorting the negated array descends directly, avoiding the reversed
+    # copy that np.sort(x)[::-1] makes when plotted
+    sort_obs = -np.sort(-sim)
+    sort_sim = -np.sort(-obs)
+
+    exceedence_obs = np.arange(1., len(sort_obs)+1, dtype=np.float32) / len(sort_obs)
+    if len(sort_sim) == len(sort_obs):
+        exceedence_sim = exceedence_obs
+    else:
+        exceedence_sim = np.arange(1., len(sort_sim)+1, dtype=np.float32) / len(sort_sim)
 
     if ax is None:
         ax = plt.gca()
@@ -298,7 +328,8 @@ def fdc_plot(
 def _plot_scores(theta, s1ave, s2ave, ax, line_colors):
 
     ax.plot(theta, s1ave, color=line_colors[0])
-    ax.plot(theta, s2ave, color=line_colors[1])
+    if s2ave is not None:
+        ax.plot(theta, s2ave, color=line_colors[1])
 
     return ax
 
@@ -310,6 +341,8 @@ def _data_for_time(s1, s2):
 
 
 def _data_for_theta(s1, s2):
+    if s2 is None:
+        return np.mean(s1, axis=1), None
     return np.mean(s1, axis=1), np.mean(s2, axis=1)
 
 def init_subplots(width=None, height=None, nrows=1, ncols=1, **kwargs):
@@ -0,0 +1,23 @@
+
+import numpy as np
+import pytest
+
+try:
+    import optuna
+except (ImportError, ModuleNotFoundError):
+    optuna = None
+
+
+@pytest.fixture(autouse=True)
+def _deterministic_env():
+    """Reseeds before every test.
+
+    The tests are independent and can be distributed with pytest-xdist
+    (``pytest -n auto``); each worker imports the module separately, so the
+    seed and optuna verbosity are re-applied per test instead of relying on
+    module-import order.
+    """
+    np.random.seed(313)
+    if optuna is not None:
+        optuna.logging.set_verbosity(optuna.logging.ERROR)
+    yield